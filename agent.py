@@ -1,6 +1,8 @@
 import logging
 import random
 import os
+import tracemalloc
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
 import aiohttp
@@ -20,6 +22,49 @@ logger = logging.getLogger(__name__)
 # Since no database is allowed, we use a global state dictionary or closure.
 # We avoid hardcoded API keys by relying on ADC (which ADK uses by default).
 
+MAX_ROUNDS = 3
+RESULT_LABELS = {"DRAW": "DRAW", "USER": "USER WINS", "BOT": "BOT WINS"}
+
+@dataclass(slots=True)
+class RoundRecord:
+    # Compact per-round record. Messages are only formatted when asked for.
+    round: int = 0
+    user_move: str = ""
+    bot_move: str = ""
+    winner: str = ""
+    bomb: bool = False
+    user_score: int = 0
+    bot_score: int = 0
+
+    @property
+    def message(self) -> str:
+        if self.winner == "DRAW":
+            return f"Draw! Both chose {self.user_move}."
+        if self.bomb:
+            loser = self.bot_move if self.winner == "USER" else self.user_move
+            return f"{self.winner.capitalize()} BOMB destroys {loser}!"
+        if self.winner == "USER":
+            return f"{self.user_move} beats {self.bot_move}!"
+        return f"{self.bot_move} beats {self.user_move}!"
+
+    @property
+    def summary(self) -> str:
+        if self.winner == "DRAW":
+            return f"Round {self.round}: Draw ({self.user_move})"
+        win_move, lose_move = (self.user_move, self.bot_move) if self.winner == "USER" else (self.bot_move, self.user_move)
+        return f"Round {self.round}: {self.winner.capitalize()} wins ({win_move} beats {lose_move})"
+
+    def to_dict(self, game_over: bool = False) -> Dict[str, Any]:
+        # Built eagerly: this is the tool result handed back to the agent.
+        return {
+            "message": self.message,
+            "round_winner": self.winner,
+            "user_score": self.user_score,
+            "bot_score": self.bot_score,
+            "round": self.round,
+            "game_over": game_over,
+        }
+
 @dataclass
 class GameState:
     user_score: int = 0
@@ -28,8 +73,36 @@ class GameState:
     user_bomb_used: bool = False
     bot_bomb_used: bool = False
     game_over: bool = False
-    round_history: list[str] = field(default_factory=list)
-    history: list[Dict[str, Any]] = field(default_factory=list) # Keep original history for results
+    # Preallocated, one slot per round (a match never exceeds MAX_ROUNDS); slots are reused across matches.
+    rounds: list[RoundRecord] = field(default_factory=lambda: [RoundRecord() for _ in range(MAX_ROUNDS)])
+    rounds_played: int = 0
+    last_result: Optional[Dict[str, Any]] = None # Result dict last returned by manage_game_state
+
+    def record_round(self, user_move: str, bot_move: str, winner: str, bomb: bool) -> RoundRecord:
+        record = self.rounds[self.rounds_played]
+        record.round = self.current_round
+        record.user_move = user_move
+        record.bot_move = bot_move
+        record.winner = winner
+        record.bomb = bomb
+        record.user_score = self.user_score
+        record.bot_score = self.bot_score
+        self.rounds_played += 1
+        return record
+
+    @property
+    def round_history(self) -> list[str]:
+        return [record.summary for record in self.rounds[:self.rounds_played]]
+
+    def reset(self):
+        self.user_score = 0
+        self.bot_score = 0
+        self.current_round = 1
+        self.user_bomb_used = False
+        self.bot_bomb_used = False
+        self.game_over = False
+        self.rounds_played = 0
+        self.last_result = None
 
     def to_dict(self):
         return {
@@ -38,7 +111,7 @@ class GameState:
             "bot_score": self.bot_score,
             "game_over": self.game_over,
             "round_history": self.round_history,
-            "last_result": self.history[-1] if self.history else "No history yet",
+            "last_result": self.last_result or "No history yet",
         }
 
 # Global state instance
@@ -46,6 +119,75 @@ game_state = GameState()
 
 MOVES = ["ROCK", "PAPER", "SCISSORS", "BOMB"]
 
+# --- Memory Profiling ---
+# Off by default. Set REFEREE_MEMORY_PROFILE=1 (or call start_memory_profiling())
+# to trace allocations and record the bytes retained by each finished match.
+# While profiling, a finished match rolls over into a new one instead of exiting,
+# so bytes-per-match can be compared across many matches in one process.
+
+MEMORY_PROFILE = os.environ.get("REFEREE_MEMORY_PROFILE") == "1"
+match_bytes: deque[int] = deque(maxlen=100)
+_profiling = False
+_match_start_bytes: Optional[int] = None # None until the current match's accounting opens
+
+def start_memory_profiling():
+    """Starts tracemalloc. Match accounting opens when the next match plays its first round."""
+    global _profiling
+    _profiling = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def begin_match_accounting():
+    """Marks the traced byte count at the start of a match."""
+    global _match_start_bytes
+    if tracemalloc.is_tracing():
+        _match_start_bytes = tracemalloc.get_traced_memory()[0]
+
+def end_match_accounting() -> Optional[int]:
+    """Records the bytes allocated since the match started. Returns None if accounting never opened."""
+    global _match_start_bytes
+    if _match_start_bytes is None or not tracemalloc.is_tracing():
+        return None
+    used = tracemalloc.get_traced_memory()[0] - _match_start_bytes
+    _match_start_bytes = None
+    match_bytes.append(used)
+    return used
+
+def take_memory_snapshot(limit: int = 10) -> list[str]:
+    """Returns the top allocation sites by size from a tracemalloc snapshot."""
+    if not tracemalloc.is_tracing():
+        return []
+    stats = tracemalloc.take_snapshot().statistics("lineno")
+    return [str(stat) for stat in stats[:limit]]
+
+def memory_report() -> Dict[str, Any]:
+    """Returns current/peak traced memory and per-match byte accounting."""
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": True,
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "matches": len(match_bytes),
+        "bytes_per_match": list(match_bytes),
+        "avg_bytes_per_match": sum(match_bytes) // len(match_bytes) if match_bytes else 0,
+    }
+
+def new_match():
+    """Resets the global game state for another match, reusing its preallocated records."""
+    game_state.reset()
+
+def _print_memory_report():
+    if not tracemalloc.is_tracing():
+        return
+    report = memory_report()
+    print(f"[Memory]: current {report['current_bytes']} B, peak {report['peak_bytes']} B, "
+          f"avg {report['avg_bytes_per_match']} B/match over {report['matches']} match(es)", flush=True)
+
+if MEMORY_PROFILE:
+    start_memory_profiling()
+
 def manage_game_state(user_move: str, bot_move: str = None) -> Dict[str, Any]:
     """
     Updates the game state based on moves. Validates rules (1 bomb limit, best of 3).
@@ -82,6 +224,7 @@ def manage_game_state(user_move: str, bot_move: str = None) -> Dict[str, Any]:
         print(f"Bot:  {game_state.bot_score}")
         print(f"Result: {final_winner}")
         print("="*30 + "\n", flush=True)
+        _print_memory_report()
         os._exit(0)
 
     # Validation
@@ -90,6 +233,9 @@ def manage_game_state(user_move: str, bot_move: str = None) -> Dict[str, Any]:
     if bot_move not in MOVES:
         bot_move = random.choice(["ROCK", "PAPER", "SCISSORS"])
 
+    if game_state.rounds_played == 0:
+        begin_match_accounting()
+
     # Bomb Logic
     user_bomb_active = False
     bot_bomb_active = False
@@ -113,45 +259,29 @@ def manage_game_state(user_move: str, bot_move: str = None) -> Dict[str, Any]:
             bot_bomb_active = True
 
     # Determine Winner
-    winner = None
-    msg = ""
-    
-    result_str = "DRAW" # For print statement
-
     if user_move == bot_move:
         winner = "DRAW"
-        msg = f"Draw! Both chose {user_move}."
-        game_state.round_history.append(f"Round {game_state.current_round}: Draw ({user_move})")
         # Rule Change: Each gets a point on Draw
         game_state.user_score += 1
         game_state.bot_score += 1
-        result_str = "DRAW"
     elif user_bomb_active:
         winner = "USER"
         game_state.user_score += 1
-        msg = f"User BOMB destroys {bot_move}!"
-        game_state.round_history.append(f"Round {game_state.current_round}: User wins (BOMB beats {bot_move})")
-        result_str = "USER WINS"
     elif bot_bomb_active:
         winner = "BOT"
         game_state.bot_score += 1
-        msg = f"Bot BOMB destroys {user_move}!"
-        game_state.round_history.append(f"Round {game_state.current_round}: Bot wins (BOMB beats {user_move})")
-        result_str = "BOT WINS"
     elif (user_move == "ROCK" and bot_move == "SCISSORS") or \
          (user_move == "SCISSORS" and bot_move == "PAPER") or \
          (user_move == "PAPER" and bot_move == "ROCK"):
         winner = "USER"
         game_state.user_score += 1
-        msg = f"{user_move} beats {bot_move}!"
-        game_state.round_history.append(f"Round {game_state.current_round}: User wins ({user_move} beats {bot_move})")
-        result_str = "USER WINS"
     else:
         winner = "BOT"
         game_state.bot_score += 1
-        msg = f"{bot_move} beats {user_move}!"
-        game_state.round_history.append(f"Round {game_state.current_round}: Bot wins ({bot_move} beats {user_move})")
-        result_str = "BOT WINS"
+
+    bomb = winner != "DRAW" and (user_bomb_active or bot_bomb_active)
+    record = game_state.record_round(user_move, bot_move, winner, bomb)
+    result_str = RESULT_LABELS[winner] # For print statement
 
     # Print Round Summary to Console (Ensures user sees it even if LLM is chat-blocked)
     print(f"\n[Referee]: Round {game_state.current_round} Complete!")
@@ -165,7 +295,7 @@ def manage_game_state(user_move: str, bot_move: str = None) -> Dict[str, Any]:
     
     # Check Game Over Conditions
     # User requested fixed 3 rounds (not Best of 3)
-    if game_state.current_round > 3:
+    if game_state.current_round > MAX_ROUNDS:
         game_state.game_over = True
         
         # Immediate Exit if Game Over occurred this turn
@@ -183,18 +313,16 @@ def manage_game_state(user_move: str, bot_move: str = None) -> Dict[str, Any]:
         print(f"Bot:  {game_state.bot_score}")
         print(f"Result: {final_winner}")
         print("="*33 + "\n", flush=True)
+        if _profiling:
+            result = record.to_dict(game_over=True)
+            end_match_accounting()
+            _print_memory_report()
+            new_match()
+            return result
         os._exit(0)
 
-    result = {
-        "message": msg,
-        "round_winner": winner,
-        "user_score": game_state.user_score,
-        "bot_score": game_state.bot_score,
-        "round": game_state.current_round - 1,
-        "game_over": game_state.game_over
-    }
-    game_state.history.append(result)
-    return result
+    game_state.last_result = record.to_dict(game_state.game_over)
+    return game_state.last_result
 
 # --- Agent Definition ---
 
@@ -0,0 +1,34 @@
+# Plays many matches through manage_game_state in one process and checks that
+# the referee's bytes-per-match stays flat and its round storage stays bounded.
+# Run with: python check_memory.py
+import contextlib
+import os
+
+os.environ["REFEREE_MEMORY_PROFILE"] = "1"
+
+import agent
+
+MATCHES = 100
+WARMUP = 5
+MAX_DRIFT_BYTES = 1024
+
+MATCH_MOVES = [
+    [("ROCK", "SCISSORS"), ("BOMB", "PAPER"), ("PAPER", "PAPER")],
+    [("PAPER", "BOMB"), ("SCISSORS", "ROCK"), ("ROCK", "PAPER")],
+    [("BOMB", "BOMB"), ("ROCK", "ROCK"), ("SCISSORS", "PAPER")],
+]
+
+with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+    for i in range(MATCHES):
+        for user_move, bot_move in MATCH_MOVES[i % len(MATCH_MOVES)]:
+            agent.manage_game_state(user_move, bot_move)
+        assert len(agent.game_state.rounds) == agent.MAX_ROUNDS
+        assert agent.game_state.rounds_played == 0, "match did not roll over"
+
+report = agent.memory_report()
+assert report["matches"] == MATCHES
+samples = report["bytes_per_match"][WARMUP:]
+print(f"matches recorded: {report['matches']}, avg {report['avg_bytes_per_match']} B/match")
+print(f"after warmup: min {min(samples)} B, max {max(samples)} B")
+assert max(samples) - min(samples) <= MAX_DRIFT_BYTES, "bytes-per-match is not flat"
+print("OK")